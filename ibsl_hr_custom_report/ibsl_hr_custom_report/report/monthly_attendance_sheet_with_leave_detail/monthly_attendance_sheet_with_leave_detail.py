@@ -3,9 +3,8 @@
 
 
 from calendar import monthrange
-from itertools import groupby
-from typing import Dict, List, Optional, Tuple
-from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from datetime import date, datetime
 import frappe
 from frappe import _
 from frappe.query_builder.functions import Count, Extract, Sum
@@ -13,6 +12,14 @@ from frappe.utils import cint, cstr, getdate
 
 Filters = frappe._dict
 
+
+class ReportSchema(NamedTuple):
+	columns: List[Dict]
+	float_fieldnames: List[str]
+	day_fieldnames: List[str]
+	total_days: int
+
+
 status_map = {
     "Present": "P",
     "Absent": "A",
@@ -25,12 +32,25 @@ status_map = {
 
 day_abbr = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
 
+leave_types_cache_key = "ibsl_hr_custom_report:leave_types"
+
+# statuses for which in and out time are kept in the attendance map; their detailed view
+# cells show worked hours, e.g. "WFH - 08:00 hrs" instead of a bare "WFH"
+statuses_with_time = frozenset(("Present", "Half Day", "Work From Home"))
+
+# color coding applied to detailed view cells, by status abbreviation
+status_colors = {"P": "green", "WFH": "green", "A": "red", "L": "#4682b4", "HD": "orange"}
+cell_templates = {
+    abbr: f'<span style="color: {color};">{{}}</span>' for abbr, color in status_colors.items()
+}
+
 def extract_time(datetime_value) -> str:
     """Extracts and returns the time part from a datetime object or string."""
     if isinstance(datetime_value, datetime):
         return datetime_value.strftime("%H:%M:%S")
     elif isinstance(datetime_value, str) and datetime_value.strip():  # Check if string is not empty
-        return datetime.strptime(datetime_value, "%Y-%m-%d %H:%M:%S").strftime("%H:%M:%S")
+        # values are always "YYYY-MM-DD HH:MM:SS[.ffffff]", so slice instead of parsing
+        return datetime_value[11:19]
     return ""
 def execute(filters: Optional[Filters] = None) -> Tuple:
 	filters = frappe._dict(filters or {})
@@ -38,24 +58,25 @@ def execute(filters: Optional[Filters] = None) -> Tuple:
 	if not (filters.month and filters.year):
 		frappe.throw(_("Please select month and year."))
 
-	attendance_map = get_attendance_map(filters)
+	attendance_map, leave_map = get_attendance_map(filters)
 	if not attendance_map:
 		frappe.msgprint(_("No attendance records found."), alert=True, indicator="orange")
 		return [], [], None, None
 
-	columns = get_columns(filters)
-	data = get_data(filters, attendance_map)
+	schema = get_report_schema(filters)
+	default_holiday_list = frappe.get_cached_value("Company", filters.company, "default_holiday_list")
+	data = get_data(filters, attendance_map, leave_map, schema, default_holiday_list)
 
 	if not data:
 		frappe.msgprint(
 			_("No attendance records found for this criteria."), alert=True, indicator="orange"
 		)
-		return columns, [], None, None
+		return schema.columns, [], None, None
 
 	message = get_message() if not filters.summarized_view else ""
-	#chart = get_chart_data(attendance_map, filters)
+	#chart = get_chart_data(attendance_map, leave_map, filters)
 
-	return columns, data, message
+	return schema.columns, data, message
 
 
 def get_message() -> str:
@@ -74,6 +95,20 @@ def get_message() -> str:
 	return message
 
 
+def get_report_schema(filters: Filters) -> ReportSchema:
+	"""Returns the report columns along with the fieldnames derived from them,
+	built once per run and passed down to the row builders"""
+	columns = get_columns(filters)
+	total_days = get_total_days_in_month(filters)
+
+	return ReportSchema(
+		columns=columns,
+		float_fieldnames=[c["fieldname"] for c in columns if c.get("fieldtype") == "Float"],
+		day_fieldnames=[cstr(day) for day in range(1, total_days + 1)],
+		total_days=total_days,
+	)
+
+
 def get_columns(filters: Filters) -> List[Dict]:
 	columns = []
 
@@ -158,7 +193,9 @@ def get_columns(filters: Filters) -> List[Dict]:
 
 
 def get_columns_for_leave_types() -> List[Dict]:
-	leave_types = frappe.db.get_all("Leave Type", pluck="name")
+	leave_types = frappe.cache().get_value(
+		leave_types_cache_key, generator=lambda: frappe.db.get_all("Leave Type", pluck="name")
+	)
 	types = []
 	for entry in leave_types:
 		types.append(
@@ -168,14 +205,19 @@ def get_columns_for_leave_types() -> List[Dict]:
 	return types
 
 
+def clear_leave_types_cache(*args, **kwargs):
+	"""Clears cached leave type names, called from Leave Type doc events"""
+	frappe.cache().delete_value(leave_types_cache_key)
+
+
 def get_columns_for_days(filters: Filters) -> List[Dict]:
     total_days = get_total_days_in_month(filters)
+    first_weekday = date(cint(filters.year), cint(filters.month), 1).weekday()
     days = []
 
     for day in range(1, total_days + 1):
         day_str = cstr(day)
-        date = "{}-{}-{}".format(cstr(filters.year), cstr(filters.month), day)
-        weekday = day_abbr[getdate(date).weekday()]
+        weekday = day_abbr[(first_weekday + day - 1) % 7]
         label = "{} {}".format(day, weekday)
         days.append({"label": label, "fieldtype": "Data", "fieldname": day_str, "width": 125})
         #days.append({"label": f"{label} In Time", "fieldtype": "Data", "fieldname": f"in_time_{day_str}", "width": 80})
@@ -190,9 +232,33 @@ def get_total_days_in_month(filters: Filters) -> int:
 	return monthrange(cint(filters.year), cint(filters.month))[1]
 
 
-def get_data(filters: Filters, attendance_map: Dict) -> List[Dict]:
+def get_month_date_range(filters: Filters) -> Tuple[date, date]:
+	"""Returns the first and last date of the filter month, so that attendance_date
+	can be matched with an index-friendly range instead of EXTRACT(month/year)"""
+	year, month = cint(filters.year), cint(filters.month)
+	return date(year, month, 1), date(year, month, get_total_days_in_month(filters))
+
+
+def get_data(
+	filters: Filters,
+	attendance_map: Dict,
+	leave_map: Dict,
+	schema: ReportSchema,
+	default_holiday_list: Optional[str],
+) -> List[Dict]:
 	employee_details, group_by_param_values = get_employee_related_details(filters)
-	holiday_map = get_holiday_map(filters)
+	holiday_map = get_holiday_map(filters, default_holiday_list)
+	emp_holiday_list_map = {
+		employee: details.holiday_list or default_holiday_list
+		for employees in (employee_details.values() if filters.group_by else [employee_details])
+		for employee, details in employees.items()
+	}
+	attendance_summary = leave_summary = entry_exits_summary = {}
+	if filters.summarized_view:
+		attendance_summary = get_attendance_summary_and_days(filters)
+		leave_summary = get_leave_summary(filters)
+		entry_exits_summary = get_entry_exits_summary(filters)
+
 	data = []
 
 	if filters.group_by:
@@ -202,59 +268,73 @@ def get_data(filters: Filters, attendance_map: Dict) -> List[Dict]:
 			if not value:
 				continue
 
-			records = get_rows(employee_details[value], filters, holiday_map, attendance_map)
+			records = get_rows(
+				employee_details[value],
+				filters,
+				holiday_map,
+				emp_holiday_list_map,
+				attendance_map,
+				leave_map,
+				attendance_summary,
+				leave_summary,
+				entry_exits_summary,
+				schema,
+			)
 
 			if records:
 				data.append({group_by_column: value})
 				data.extend(records)
 	else:
-		data = get_rows(employee_details, filters, holiday_map, attendance_map)
+		data = get_rows(
+			employee_details,
+			filters,
+			holiday_map,
+			emp_holiday_list_map,
+			attendance_map,
+			leave_map,
+			attendance_summary,
+			leave_summary,
+			entry_exits_summary,
+			schema,
+		)
 
 	return data
 
 
-def get_attendance_map(filters: Filters) -> Dict:
+def get_attendance_map(filters: Filters) -> Tuple[Dict, Dict]:
+    """Returns
+    1. shift-wise attendance by day for each employee
+    2. leaves by day for each employee, kept apart since a leave applies to every shift
+    """
     attendance_list = get_attendance_records(filters)
     attendance_map = {}
     leave_map = {}
 
     for d in attendance_list:
-        if d.status == "On Leave":
-            leave_map.setdefault(d.employee, []).append({
-                "day": d.day_of_month,
+        status = d.status
+        if status == "On Leave":
+            leave_map.setdefault(d.employee, {})[d.day_of_month] = {
+                "status": status,
                 "leave_type": d.leave_type
-            })
+            }
             continue
 
-        if d.shift is None:
-            d.shift = ""
-
-        attendance_map.setdefault(d.employee, {}).setdefault(d.shift, {})
-        if d.status == "Present":
-            attendance_map[d.employee][d.shift][d.day_of_month] = {
-                "status": d.status,
+        shift_map = attendance_map.setdefault(d.employee, {}).setdefault(d.shift or "", {})
+        if status in statuses_with_time:
+            shift_map[d.day_of_month] = {
+                "status": status,
                 "in_time": d.in_time,
                 "out_time": d.out_time
             }
         else:
-            attendance_map[d.employee][d.shift][d.day_of_month] = {"status": d.status}
+            shift_map[d.day_of_month] = {"status": status}
 
-    # leave is applicable for the entire day, so all shifts should show the leave entry
-    for employee, leave_entries in leave_map.items():
+    for employee in leave_map:
         # no attendance records exist except leaves
         if employee not in attendance_map:
-            attendance_map.setdefault(employee, {}).setdefault(None, {})
-
-        for entry in leave_entries:
-            day = entry["day"]
-            leave_type = entry["leave_type"]
-            for shift in attendance_map[employee].keys():
-                attendance_map[employee][shift][day] = {
-                    "status": "On Leave",
-                    "leave_type": leave_type
-                }
+            attendance_map[employee] = {None: {}}
 
-    return attendance_map
+    return attendance_map, leave_map
 
 
 
@@ -275,8 +355,7 @@ def get_attendance_records(filters: Filters) -> List[Dict]:
         .where(
             (Attendance.docstatus == 1)
             & (Attendance.company == filters.company)
-            & (Extract("month", Attendance.attendance_date) == filters.month)
-            & (Extract("year", Attendance.attendance_date) == filters.year)
+            & (Attendance.attendance_date.between(*get_month_date_range(filters)))
         )
     )
 
@@ -312,23 +391,19 @@ def get_employee_related_details(filters: Filters) -> Tuple[Dict, List]:
 	if filters.employee:
 		query = query.where(Employee.name == filters.employee)
 
-	group_by = filters.group_by
-	if group_by:
-		group_by = group_by.lower()
-		query = query.orderby(group_by)
-
 	employee_details = query.run(as_dict=True)
 
+	group_by = filters.group_by
 	group_by_param_values = []
 	emp_map = {}
 
 	if group_by:
-		for parameter, employees in groupby(employee_details, key=lambda d: d[group_by]):
-			group_by_param_values.append(parameter)
-			emp_map.setdefault(parameter, frappe._dict())
+		group_by = group_by.lower()
+		for emp in employee_details:
+			emp_map.setdefault(emp[group_by], {})[emp.name] = emp
 
-			for emp in employees:
-				emp_map[parameter][emp.name] = emp
+		# groups are listed in case-insensitive sorted order, like the site's default collation
+		group_by_param_values = sorted(emp_map, key=lambda v: cstr(v).casefold())
 	else:
 		for emp in employee_details:
 			emp_map[emp.name] = emp
@@ -336,27 +411,22 @@ def get_employee_related_details(filters: Filters) -> Tuple[Dict, List]:
 	return emp_map, group_by_param_values
 
 
-def get_holiday_map(filters: Filters) -> Dict[str, List[Dict]]:
+def get_holiday_map(
+	filters: Filters, default_holiday_list: Optional[str]
+) -> Dict[str, Dict[int, str]]:
 	"""
 	Returns a dict of holidays falling in the filter month and year
-	with list name as key and list of holidays as values like
+	with list name as key and holiday status by day of month as values like
 	{
-	        'Holiday List 1': [
-	                {'day_of_month': '0' , 'weekly_off': 1},
-	                {'day_of_month': '1', 'weekly_off': 0}
-	        ],
-	        'Holiday List 2': [
-	                {'day_of_month': '0' , 'weekly_off': 1},
-	                {'day_of_month': '1', 'weekly_off': 0}
-	        ]
+	        'Holiday List 1': {1: 'Weekly Off', 2: 'Holiday'},
+	        'Holiday List 2': {1: 'Weekly Off', 8: 'Weekly Off'}
 	}
 	"""
 	# add default holiday list too
 	holiday_lists = frappe.db.get_all("Holiday List", pluck="name")
-	default_holiday_list = frappe.get_cached_value("Company", filters.company, "default_holiday_list")
 	holiday_lists.append(default_holiday_list)
 
-	holiday_map = frappe._dict()
+	holiday_map = {}
 	Holiday = frappe.qb.DocType("Holiday")
 
 	for d in holiday_lists:
@@ -373,43 +443,67 @@ def get_holiday_map(filters: Filters) -> Dict[str, List[Dict]]:
 			)
 		).run(as_dict=True)
 
-		holiday_map.setdefault(d, holidays)
+		holiday_map.setdefault(
+			d,
+			{
+				cint(holiday.day_of_month): "Weekly Off" if holiday.weekly_off else "Holiday"
+				for holiday in holidays
+			},
+		)
 
 	return holiday_map
 
 
 def get_rows(
-	employee_details: Dict, filters: Filters, holiday_map: Dict, attendance_map: Dict
+	employee_details: Dict,
+	filters: Filters,
+	holiday_map: Dict,
+	emp_holiday_list_map: Dict[str, Optional[str]],
+	attendance_map: Dict,
+	leave_map: Dict,
+	attendance_summary: Dict,
+	leave_summary: Dict,
+	entry_exits_summary: Dict,
+	schema: ReportSchema,
 ) -> List[Dict]:
 	records = []
-	default_holiday_list = frappe.get_cached_value("Company", filters.company, "default_holiday_list")
+	# zero defaults for all float columns of the summarized view
+	float_defaults = dict.fromkeys(schema.float_fieldnames, 0.0)
 
 	for employee, details in employee_details.items():
-		emp_holiday_list = details.holiday_list or default_holiday_list
-		holidays = holiday_map.get(emp_holiday_list)
+		holidays = holiday_map.get(emp_holiday_list_map[employee])
 
 		if filters.summarized_view:
-			attendance = get_attendance_status_for_summarized_view(employee, filters, holidays)
-			if not attendance:
+			employee_summary = attendance_summary.get(employee)
+			if not employee_summary:
 				continue
 
-			leave_summary = get_leave_summary(employee, filters)
-			entry_exits_summary = get_entry_exits_summary(employee, filters)
-
-			row = {"employee": employee, "employee_name": details.employee_name}
-			set_defaults_for_summarized_view(filters, row)
-			row.update(attendance)
-			row.update(leave_summary)
-			row.update(entry_exits_summary)
+			attendance = get_attendance_status_for_summarized_view(
+				employee_summary["summary"], employee_summary["days"], schema.total_days, holidays
+			)
+			if not attendance:
+				continue
 
-			records.append(row)
+			records.append(
+				{
+					"employee": employee,
+					"employee_name": details.employee_name,
+					**float_defaults,
+					**attendance,
+					**leave_summary.get(employee, {}),
+					**entry_exits_summary.get(employee, {}),
+				}
+			)
 		else:
 			employee_attendance = attendance_map.get(employee)
 			if not employee_attendance:
 				continue
 
 			attendance_for_employee = get_attendance_status_for_detailed_view(
-				employee, filters, employee_attendance, holidays
+				schema.day_fieldnames,
+				employee_attendance,
+				leave_map.get(employee, {}),
+				holidays,
 			)
 			# set employee details in the first row
 			attendance_for_employee[0].update(
@@ -421,23 +515,15 @@ def get_rows(
 	return records
 
 
-def set_defaults_for_summarized_view(filters, row):
-	for entry in get_columns(filters):
-		if entry.get("fieldtype") == "Float":
-			row[entry.get("fieldname")] = 0.0
-
-
 def get_attendance_status_for_summarized_view(
-	employee: str, filters: Filters, holidays: List
+	summary: Dict, attendance_days: Set[int], total_days: int, holidays: Dict[int, str]
 ) -> Dict:
 	"""Returns dict of attendance status for employee like
 	{'total_present': 1.5, 'total_leaves': 0.5, 'total_absent': 13.5, 'total_holidays': 8, 'unmarked_days': 5}
 	"""
-	summary, attendance_days = get_attendance_summary_and_days(employee, filters)
 	if not any(summary.values()):
 		return {}
 
-	total_days = get_total_days_in_month(filters)
 	total_holidays = total_unmarked_days = 0
 
 	for day in range(1, total_days + 1):
@@ -451,64 +537,64 @@ def get_attendance_status_for_summarized_view(
 			total_unmarked_days += 1
 
 	return {
-		"total_present": summary.total_present + summary.total_half_days,
-		"total_leaves": summary.total_leaves + summary.total_half_days,
-		"total_absent": summary.total_absent,
+		"total_present": summary["total_present"] + summary["total_half_days"],
+		"total_leaves": summary["total_leaves"] + summary["total_half_days"],
+		"total_absent": summary["total_absent"],
 		"total_holidays": total_holidays,
 		"unmarked_days": total_unmarked_days,
 	}
 
 
-def get_attendance_summary_and_days(employee: str, filters: Filters) -> Tuple[Dict, List]:
+def get_attendance_summary_and_days(filters: Filters) -> Dict[str, Dict]:
+	"""Returns attendance totals and the set of days with attendance, per employee like
+	{'HR-EMP-00001': {'summary': {'total_present': 20, 'total_absent': 1, ...}, 'days': {1, 2, 3}}}
+	"""
 	Attendance = frappe.qb.DocType("Attendance")
 
-	present_case = (
-		frappe.qb.terms.Case()
-		.when(((Attendance.status == "Present") | (Attendance.status == "Work From Home")), 1)
-		.else_(0)
+	conditions = (
+		(Attendance.docstatus == 1)
+		& (Attendance.company == filters.company)
+		& (Attendance.attendance_date.between(*get_month_date_range(filters)))
 	)
-	sum_present = Sum(present_case).as_("total_present")
-
-	absent_case = frappe.qb.terms.Case().when(Attendance.status == "Absent", 1).else_(0)
-	sum_absent = Sum(absent_case).as_("total_absent")
-
-	leave_case = frappe.qb.terms.Case().when(Attendance.status == "On Leave", 1).else_(0)
-	sum_leave = Sum(leave_case).as_("total_leaves")
-
-	half_day_case = frappe.qb.terms.Case().when(Attendance.status == "Half Day", 0.5).else_(0)
-	sum_half_day = Sum(half_day_case).as_("total_half_days")
+	if filters.employee:
+		conditions &= Attendance.employee == filters.employee
 
-	summary = (
+	status_counts = (
 		frappe.qb.from_(Attendance)
-		.select(
-			sum_present,
-			sum_absent,
-			sum_leave,
-			sum_half_day,
-		)
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company == filters.company)
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
-		)
+		.select(Attendance.employee, Attendance.status, Count("*").as_("status_count"))
+		.where(conditions)
+		.groupby(Attendance.employee, Attendance.status)
 	).run(as_dict=True)
 
 	days = (
 		frappe.qb.from_(Attendance)
-		.select(Extract("day", Attendance.attendance_date).as_("day_of_month"))
+		.select(Attendance.employee, Extract("day", Attendance.attendance_date).as_("day_of_month"))
 		.distinct()
-		.where(
-			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
-			& (Attendance.company == filters.company)
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
-		)
-	).run(pluck=True)
+		.where(conditions)
+	).run(as_dict=True)
 
-	return summary[0], days
+	attendance_summary = {}
+	for d in status_counts:
+		if d.employee not in attendance_summary:
+			attendance_summary[d.employee] = {
+				"summary": {"total_present": 0, "total_absent": 0, "total_leaves": 0, "total_half_days": 0},
+				"days": set(),
+			}
+
+		summary = attendance_summary[d.employee]["summary"]
+		if d.status in ("Present", "Work From Home"):
+			summary["total_present"] += d.status_count
+		elif d.status == "Absent":
+			summary["total_absent"] += d.status_count
+		elif d.status == "On Leave":
+			summary["total_leaves"] += d.status_count
+		elif d.status == "Half Day":
+			summary["total_half_days"] += d.status_count * 0.5
+
+	for d in days:
+		attendance_summary[d.employee]["days"].add(d.day_of_month)
+
+	return attendance_summary
 
 from datetime import datetime
 import calendar
@@ -517,8 +603,8 @@ def calculate_working_hours(in_time, out_time):
     if not in_time or not out_time:
         return ""
     try:
-        in_dt = in_time if isinstance(in_time, datetime) else datetime.strptime(in_time, "%Y-%m-%d %H:%M:%S")
-        out_dt = out_time if isinstance(out_time, datetime) else datetime.strptime(out_time, "%Y-%m-%d %H:%M:%S")
+        in_dt = in_time if isinstance(in_time, datetime) else datetime.fromisoformat(in_time)
+        out_dt = out_time if isinstance(out_time, datetime) else datetime.fromisoformat(out_time)
         delta = out_dt - in_dt
         total_seconds = delta.total_seconds()
         hours = int(total_seconds // 3600)
@@ -528,7 +614,10 @@ def calculate_working_hours(in_time, out_time):
         return ""
 
 def get_attendance_status_for_detailed_view(
-    employee: str, filters: Filters, employee_attendance: Dict, holidays: List
+    day_fieldnames: List[str],
+    employee_attendance: Dict,
+    employee_leaves: Dict,
+    holidays: Dict[int, str],
 ) -> List[Dict]:
     """Returns list of shift-wise attendance status for employee
     [
@@ -536,137 +625,94 @@ def get_attendance_status_for_detailed_view(
             {'shift': 'Evening Shift', 1: 'P', 2: 'A', 3: 'P'...., 'in_time_2': '09:00', 'out_time_2': '18:00', ...}
     ]
     """
-    total_days = get_total_days_in_month(filters)
-    year = int(filters.year)
-    month_num = int(filters.month)
     attendance_values = []
     #frappe.throw(str(filters.month))
 
     for shift, status_dict in employee_attendance.items():
         row = {"shift": shift}
 
-        for day in range(1, total_days + 1):
-            day_str = cstr(day)
-            status_info = status_dict.get(day)
+        for day, day_str in enumerate(day_fieldnames, 1):
+            # leave is applicable for the entire day, so all shifts should show the leave entry
+            status_info = employee_leaves.get(day) or status_dict.get(day)
             #frappe.throw(str(status_info))
-            if status_info is None and holidays:
-                status_info = {'status': get_holiday_status(day, holidays)}
-
-            if isinstance(status_info, dict):
-                status = status_info.get('status')
-                #da=status_info.get("name")
-                #frappe.throw(str(da))
-                #wo=status_info.get('in_time')
-                in_time = status_info.get('in_time')
-                out_time = status_info.get('out_time')
-                #frappe.throw(str(status_info))
-                #in_time = extract_time(status_info.get('in_time', ''))
-                #out_time = extract_time(status_info.get('out_time', ''))
-                leave_type = status_info.get('leave_type', '')
-                #att_doc = frappe.get_value("Attendance", {"employee": employee, "attendance_date": f"{year}-{month:02d}-{int(day_str):02d}"}, ["in_time", "out_time"], as_dict=True)
-                abbr = status_map.get(status, "")
-                row[day_str] = abbr
-                if abbr == "HD" and (not in_time or not out_time):
-                    att_doc = frappe.get_value(
-                        "Attendance",
-                        {
-                            "employee": employee,
-                            "attendance_date": f"{year}-{month_num:02d}-{int(day_str):02d}"
-                        },
-                        ["in_time", "out_time"],
-                        as_dict=True
-                    )
-                    if att_doc:
-                        in_time = att_doc.in_time
-                        out_time = att_doc.out_time
-
-                # Calculate working hours
-                wo = calculate_working_hours(in_time, out_time)
-                #wo = calculate_working_hours(in_time, out_time)
-                #row[f"in_time_{day_str}"] = in_time
-                if leave_type:
-                    cell_value = leave_type
-                else:
-                    if abbr == "HD":
-                        cell_value = f"{abbr} - {wo if wo else '04:00'} hrs"
-                    else:
-                        cell_value = f"{abbr} - {wo} hrs" if wo else abbr
-
-                # Apply color coding
-                if abbr == "P":
-                    cell_value = f'<span style="color: green;">{cell_value}</span>'
-                elif abbr == "A":
-                    cell_value = f'<span style="color: red;">{cell_value}</span>'
-                elif abbr == "L":
-                    cell_value = f'<span style="color: #4682b4;">{cell_value}</span>'
-                elif abbr == "HD":
-                    cell_value = f'<span style="color: orange;">{cell_value}</span>'
-
-                row[day_str] = cell_value
-                #if leave_type:
-                	#row[day_str] = leave_type
-                #else:
-                	#row[day_str] = f"{abbr} - {wo} hrs" if wo else abbr
-                #row[f"out_time_{day_str}"] = out_time
+            if status_info is None:
+                status_info = {"status": get_holiday_status(day, holidays)}
+
+            status = status_info.get('status')
+            #da=status_info.get("name")
+            #frappe.throw(str(da))
+            #wo=status_info.get('in_time')
+            in_time = status_info.get('in_time')
+            out_time = status_info.get('out_time')
+            #frappe.throw(str(status_info))
+            #in_time = extract_time(status_info.get('in_time', ''))
+            #out_time = extract_time(status_info.get('out_time', ''))
+            leave_type = status_info.get('leave_type', '')
+            abbr = status_map.get(status, "")
+
+            # Calculate working hours
+            wo = calculate_working_hours(in_time, out_time)
+            #wo = calculate_working_hours(in_time, out_time)
+            #row[f"in_time_{day_str}"] = in_time
+            if leave_type:
+                cell_value = leave_type
             else:
-                status = status_info
-                abbr = status_map.get(status, "")
-                row[day_str] = abbr
-                #row[f"in_time_{day_str}"] = ""
-                #row[f"leave_type{day_str}"] = ""
-                #row[f"out_time_{day_str}"] = ""
+                if abbr == "HD":
+                    cell_value = f"{abbr} - {wo if wo else '04:00'} hrs"
+                else:
+                    cell_value = f"{abbr} - {wo} hrs" if wo else abbr
+
+            # Apply color coding
+            row[day_str] = cell_templates.get(abbr, "{}").format(cell_value)
+            #if leave_type:
+            	#row[day_str] = leave_type
+            #else:
+            	#row[day_str] = f"{abbr} - {wo} hrs" if wo else abbr
+            #row[f"out_time_{day_str}"] = out_time
 
         attendance_values.append(row)
 
     return attendance_values
 
 
-def get_holiday_status(day: int, holidays: List) -> str:
-	status = None
-	if holidays:
-		for holiday in holidays:
-			if day == holiday.get("day_of_month"):
-				if holiday.get("weekly_off"):
-					status = "Weekly Off"
-				else:
-					status = "Holiday"
-				break
-	return status
+def get_holiday_status(day: int, holidays: Dict[int, str]) -> str:
+	return holidays.get(day) if holidays else None
 
 
-def get_leave_summary(employee: str, filters: Filters) -> Dict[str, float]:
-	"""Returns a dict of leave type and corresponding leaves taken by employee like:
-	{'leave_without_pay': 1.0, 'sick_leave': 2.0}
+def get_leave_summary(filters: Filters) -> Dict[str, Dict[str, float]]:
+	"""Returns a dict of leave type and corresponding leaves taken, per employee like:
+	{'HR-EMP-00001': {'leave_without_pay': 1.0, 'sick_leave': 2.0}}
 	"""
 	Attendance = frappe.qb.DocType("Attendance")
 	day_case = frappe.qb.terms.Case().when(Attendance.status == "Half Day", 0.5).else_(1)
 	sum_leave_days = Sum(day_case).as_("leave_days")
 
-	leave_details = (
+	query = (
 		frappe.qb.from_(Attendance)
-		.select(Attendance.leave_type, sum_leave_days)
+		.select(Attendance.employee, Attendance.leave_type, sum_leave_days)
 		.where(
-			(Attendance.employee == employee)
-			& (Attendance.docstatus == 1)
+			(Attendance.docstatus == 1)
 			& (Attendance.company == filters.company)
 			& ((Attendance.leave_type.isnotnull()) | (Attendance.leave_type != ""))
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
+			& (Attendance.attendance_date.between(*get_month_date_range(filters)))
 		)
-		.groupby(Attendance.leave_type)
-	).run(as_dict=True)
+		.groupby(Attendance.employee, Attendance.leave_type)
+	)
+
+	if filters.employee:
+		query = query.where(Attendance.employee == filters.employee)
 
 	leaves = {}
-	for d in leave_details:
+	for d in query.run(as_dict=True):
 		leave_type = frappe.scrub(d.leave_type)
-		leaves[leave_type] = d.leave_days
+		leaves.setdefault(d.employee, {})[leave_type] = d.leave_days
 
 	return leaves
 
 
-def get_entry_exits_summary(employee: str, filters: Filters) -> Dict[str, float]:
-	"""Returns total late entries and total early exits for employee like:
-	{'total_late_entries': 5, 'total_early_exits': 2}
+def get_entry_exits_summary(filters: Filters) -> Dict[str, Dict[str, float]]:
+	"""Returns total late entries and total early exits per employee like:
+	{'HR-EMP-00001': {'total_late_entries': 5, 'total_early_exits': 2}}
 	"""
 	Attendance = frappe.qb.DocType("Attendance")
 
@@ -676,19 +722,27 @@ def get_entry_exits_summary(employee: str, filters: Filters) -> Dict[str, float]
 	early_exit_case = frappe.qb.terms.Case().when(Attendance.early_exit == "1", "1")
 	count_early_exits = Count(early_exit_case).as_("total_early_exits")
 
-	entry_exits = (
+	query = (
 		frappe.qb.from_(Attendance)
-		.select(count_late_entries, count_early_exits)
+		.select(Attendance.employee, count_late_entries, count_early_exits)
 		.where(
 			(Attendance.docstatus == 1)
-			& (Attendance.employee == employee)
 			& (Attendance.company == filters.company)
-			& (Extract("month", Attendance.attendance_date) == filters.month)
-			& (Extract("year", Attendance.attendance_date) == filters.year)
+			& (Attendance.attendance_date.between(*get_month_date_range(filters)))
 		)
-	).run(as_dict=True)
+		.groupby(Attendance.employee)
+	)
 
-	return entry_exits[0]
+	if filters.employee:
+		query = query.where(Attendance.employee == filters.employee)
+
+	return {
+		d.employee: {
+			"total_late_entries": d.total_late_entries,
+			"total_early_exits": d.total_early_exits,
+		}
+		for d in query.run(as_dict=True)
+	}
 
 
 @frappe.whitelist()
@@ -709,36 +763,34 @@ def get_attendance_years() -> str:
 	return "\n".join(cstr(entry.year) for entry in year_list)
 
 
-def get_chart_data(attendance_map: Dict, filters: Filters) -> Dict:
-	days = get_columns_for_days(filters)
-	labels = []
-	absent = []
-	present = []
-	leave = []
-
-	for day in days:
-		labels.append(day["label"])
-		total_absent_on_day = total_leaves_on_day = total_present_on_day = 0
-
-		for employee, attendance_dict in attendance_map.items():
-			for shift, attendance in attendance_dict.items():
-				attendance_on_day = attendance.get(cint(day["fieldname"]))
-
-				if attendance_on_day == "On Leave":
-					# leave should be counted only once for the entire day
-					total_leaves_on_day += 1
-					break
-				elif attendance_on_day == "Absent":
-					total_absent_on_day += 1
-				elif attendance_on_day in ["Present", "Work From Home"]:
-					total_present_on_day += 1
-				elif attendance_on_day == "Half Day":
-					total_present_on_day += 0.5
-					total_leaves_on_day += 0.5
-
-		absent.append(total_absent_on_day)
-		present.append(total_present_on_day)
-		leave.append(total_leaves_on_day)
+def get_chart_data(attendance_map: Dict, leave_map: Dict, filters: Filters) -> Dict:
+	labels = [day["label"] for day in get_columns_for_days(filters)]
+	absent = [0] * len(labels)
+	present = [0] * len(labels)
+	leave = [0] * len(labels)
+
+	# single pass over the attendance map, accumulating into per-day totals
+	for employee, attendance_dict in attendance_map.items():
+		leave_days = leave_map.get(employee, {})
+		for day in leave_days:
+			# leave should be counted only once for the entire day
+			leave[day - 1] += 1
+
+		for shift, attendance in attendance_dict.items():
+			for day, attendance_on_day in attendance.items():
+				if day in leave_days:
+					continue
+
+				status = attendance_on_day.get("status")
+				index = day - 1
+
+				if status == "Absent":
+					absent[index] += 1
+				elif status in ["Present", "Work From Home"]:
+					present[index] += 1
+				elif status == "Half Day":
+					present[index] += 0.5
+					leave[index] += 0.5
 
 	return {
 		"data": {
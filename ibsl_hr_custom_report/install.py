@@ -0,0 +1,14 @@
+from ibsl_hr_custom_report.patches.v1_0.add_attendance_company_date_index import (
+	execute as add_attendance_company_date_index,
+)
+
+
+def after_install():
+	# patches are marked as completed without running on a fresh install
+	add_attendance_company_date_index()
+
+
+def after_app_install(app_name):
+	# HRMS installed after this app brings the Attendance table the index is added to
+	if app_name == "hrms":
+		add_attendance_company_date_index()
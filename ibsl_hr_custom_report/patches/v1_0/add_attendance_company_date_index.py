@@ -0,0 +1,14 @@
+import frappe
+
+
+def execute():
+	# Attendance comes from HRMS, which may not be installed (yet)
+	if not frappe.db.table_exists("Attendance"):
+		return
+
+	# matches the docstatus/company/attendance_date filters of the monthly attendance reports
+	frappe.db.add_index(
+		"Attendance",
+		["company", "docstatus", "attendance_date"],
+		index_name="company_docstatus_date_index",
+	)